@@ -1,25 +1,192 @@
 # app/main.py
 # --- STANDARD LIBRARY ---
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Hashable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from datetime import datetime
-import tempfile
+from pathlib import Path
+from typing import TypeVar
+from urllib.parse import quote
 
 # --- THIRD PARTY ---
-from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Request, Form
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from weasyprint import HTML
+from jinja2 import FileSystemBytecodeCache
+from pydantic import BaseModel, ConfigDict
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
 
-app = FastAPI(title="Smart CV Generator")
+_V = TypeVar("_V")
+
+
+class BoundedCache(OrderedDict[Hashable, _V]):
+    """Dictionnaire LRU : l'entrée la moins récemment utilisée est évincée."""
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(  # type: ignore[override]
+        self, key: Hashable, default: _V | None = None
+    ) -> _V | None:
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key: Hashable, value: _V) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """Démarre le pool de processus de rendu PDF et l'arrête à l'extinction."""
+    application.state.pdf_executor = _new_pdf_executor()
+    yield
+    application.state.pdf_executor.shutdown()
+
+
+app = FastAPI(title="Smart CV Generator", lifespan=lifespan)
 
 # Configuration templates & static
 templates = Jinja2Templates(directory="app/templates")
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+# Templates compilés conservés sur disque entre deux démarrages (optionnel)
+JINJA_CACHE_DIR = Path(os.getenv("JINJA_CACHE_DIR", "build/jinja_cache"))
+
+
+def _jinja_bytecode_cache() -> FileSystemBytecodeCache | None:
+    """Désactive le cache si le dossier n'est pas inscriptible (conteneur en RO)."""
+    try:
+        JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    if not os.access(JINJA_CACHE_DIR, os.W_OK):
+        return None
+    return FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
+
+
+templates.env.bytecode_cache = _jinja_bytecode_cache()
+
+# Template du CV chargé une seule fois au démarrage
+CV_TEMPLATE = templates.env.get_template("cv_template.html")
+
+# Polices et feuille de style du CV analysées une seule fois pour tous les PDF
+FONT_CONFIG = FontConfiguration()
+CV_CSS = [CSS(filename="app/static/styleCV.css", font_config=FONT_CONFIG)]
+
+# Options de sortie : images recompressées et flux PDF compressés
+PDF_OPTIONS: dict[str, bool | int] = {
+    "optimize_images": True,
+    "jpeg_quality": 85,
+    "uncompressed_pdf": False,
+}
+
+# Images décodées partagées entre les rendus. WeasyPrint y range aussi les
+# données des images référencées par ses autres entrées : on ne retire jamais
+# une clé isolée, le cache est vidé en entier entre deux rendus s'il déborde.
+IMAGE_CACHE_MAX_ENTRIES = 128
+IMAGE_CACHE: dict[object, object] = {}
+
+
+def _render_pdf(html_content: str) -> bytes:
+    """Convertit le HTML du CV en PDF (appel bloquant, CPU intensif)."""
+    if len(IMAGE_CACHE) > IMAGE_CACHE_MAX_ENTRIES:
+        IMAGE_CACHE.clear()
+    pdf_bytes: bytes = HTML(string=html_content).write_pdf(
+        stylesheets=CV_CSS,
+        font_config=FONT_CONFIG,
+        cache=IMAGE_CACHE,
+        **PDF_OPTIONS,
+    )
+    return pdf_bytes
+
+
+# Année du pied de page, recalculée au plus une fois par heure
+_YEAR_CACHE: dict[str, float] = {"year": datetime.now().year, "until": 0.0}
+
+
+def _year() -> int:
+    """Renvoie l'année courante sans reconstruire un datetime à chaque requête."""
+    now = time.time()
+    if now > _YEAR_CACHE["until"]:
+        _YEAR_CACHE["year"] = datetime.now().year
+        _YEAR_CACHE["until"] = now + 3600
+    return int(_YEAR_CACHE["year"])
+
+
+# Cache LRU des PDF déjà générés, indexé par l'empreinte des champs du CV.
+# Les PDF volumineux ne sont pas gardés : au plus 256 × 256 Kio en mémoire.
+PDF_CACHE_MAX_ENTRY_BYTES = 256 * 1024
+_PDF_CACHE: BoundedCache[bytes] = BoundedCache(maxsize=256)
+
+
+def _cv_key(*fields: str | int) -> str:
+    """Calcule l'empreinte BLAKE2b des champs qui déterminent le PDF."""
+    raw = "\0".join(str(field) for field in fields).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _content_disposition(filename: str) -> str:
+    """En-tête de téléchargement, encodé RFC 5987 si le nom n'est pas ASCII."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _warmup() -> None:
+    """Précharge WeasyPrint et les polices dans chaque processus de rendu."""
+    _render_pdf("<p></p>")
+
+
+# Processus de rendu lancés en "spawn" : un fork du serveur (threads anyio,
+# fontconfig/Pango déjà initialisés) risque des interblocages. Chaque processus
+# réimporte app.main et construit ses propres polices et CSS.
+PDF_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _new_pdf_executor() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=PDF_MP_CONTEXT, initializer=_warmup
+    )
+
+
+async def _render_in_pool(html_content: str) -> bytes:
+    """Rend le PDF dans le pool ; le recrée une fois si un processus est mort."""
+    loop = asyncio.get_running_loop()
+    for _attempt in range(2):
+        executor = app.state.pdf_executor
+        try:
+            pdf_bytes: bytes = await loop.run_in_executor(
+                executor, _render_pdf, html_content
+            )
+            return pdf_bytes
+        except BrokenProcessPool:
+            # Un seul remplacement si plusieurs requêtes échouent en même temps
+            if app.state.pdf_executor is executor:
+                executor.shutdown(wait=False)
+                app.state.pdf_executor = _new_pdf_executor()
+    raise HTTPException(status_code=503, detail="Échec de la génération du PDF.")
+
 
 # Modèle de données typé
 class CVData(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=False, extra="forbid")
+
     name: str
     email: str
     skills: str
@@ -32,20 +199,30 @@ async def form_page(request: Request) -> HTMLResponse:
     return templates.TemplateResponse("form.html", {"request": request})
 
 
-@app.post("/generate", response_class=FileResponse)
+@app.post("/generate", response_class=Response)
 async def generate_pdf(
     _: Request,  # ← IGNORÉ INTENTIONNELLEMENT
     name: str = Form(...),
     email: str = Form(...),
     skills: str = Form(...),
     experience: str = Form(...),
-) -> FileResponse:
+) -> Response:
     """Génère un PDF à partir des données du formulaire."""
-    data = CVData(name=name, email=email, skills=skills, experience=experience)
-    html_content: str = templates.get_template("cv_template.html").render(
-        cv=data.dict(), year=datetime.now().year
+    year = _year()
+    key = _cv_key(name, email, skills, experience, year)
+    pdf_bytes = _PDF_CACHE.get(key)
+    if pdf_bytes is None:
+        data = CVData(name=name, email=email, skills=skills, experience=experience)
+        html_content: str = CV_TEMPLATE.render(cv=data.model_dump(), year=year)
+        # PDF généré en mémoire dans le pool de processus (un rendu par cœur)
+        pdf_bytes = await _render_in_pool(html_content)
+        if len(pdf_bytes) <= PDF_CACHE_MAX_ENTRY_BYTES:
+            _PDF_CACHE[key] = pdf_bytes
+    filename = f"{name.replace(' ', '_')}_CV.pdf"
+    # Pas de StreamingResponse : WeasyPrint ne sérialise le PDF qu'une fois
+    # toutes les pages mises en page, le premier octet ne partirait pas plus tôt.
+    return Response(
+        pdf_bytes,
+        media_type="application/pdf",
+        headers={"Content-Disposition": _content_disposition(filename)},
     )
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-        HTML(string=html_content).write_pdf(tmp_pdf.name)
-        pdf_path: str = tmp_pdf.name
-    return FileResponse(pdf_path, filename=f"{data.name.replace(' ', '_')}_CV.pdf")
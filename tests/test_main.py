@@ -0,0 +1,97 @@
+# tests/test_main.py
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+try:
+    from fastapi.testclient import TestClient
+
+    from app import main
+    from app.main import _content_disposition, app
+except (ImportError, OSError) as exc:  # WeasyPrint exige pango/cairo
+    pytest.skip(f"Dépendances absentes : {exc}", allow_module_level=True)
+
+FORM = {
+    "name": "Jean",
+    "email": "jean@example.com",
+    "skills": "Go",
+    "experience": "Dev",
+}
+
+
+def test_content_disposition_ascii() -> None:
+    assert _content_disposition("Jean_CV.pdf") == 'attachment; filename="Jean_CV.pdf"'
+
+
+def test_content_disposition_non_ascii() -> None:
+    header = _content_disposition("Jérôme_李雷_CV.pdf")
+    assert header == (
+        "attachment; filename*=utf-8''J%C3%A9r%C3%B4me_%E6%9D%8E%E9%9B%B7_CV.pdf"
+    )
+
+
+def test_generate_pdf_non_ascii_name() -> None:
+    form = {**FORM, "name": 'Łukasz "李雷"'}
+    with TestClient(app) as client:
+        response = client.post("/generate", data=form)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"].startswith(
+        "attachment; filename*=utf-8''"
+    )
+
+
+def test_pdf_pool_uses_spawn() -> None:
+    with TestClient(app):
+        executor = app.state.pdf_executor
+        assert executor._mp_context.get_start_method() == "spawn"
+
+
+def test_generate_pdf_recovers_from_broken_pool() -> None:
+    main._PDF_CACHE.clear()  # le rendu doit passer par le pool
+    with TestClient(app) as client:
+        # Tue un processus de rendu : le pool devient inutilisable
+        crash = app.state.pdf_executor.submit(os._exit, 1)
+        with pytest.raises(BrokenProcessPool):
+            crash.result()
+        response = client.post("/generate", data=FORM)
+    assert response.status_code == 200
+
+
+def test_large_pdf_is_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    big_pdf = b"%PDF-" + b"0" * main.PDF_CACHE_MAX_ENTRY_BYTES
+
+    async def fake_render(_html: str) -> bytes:
+        return big_pdf
+
+    monkeypatch.setattr(main, "_render_in_pool", fake_render)
+    main._PDF_CACHE.clear()
+    with TestClient(app) as client:
+        response = client.post("/generate", data=FORM)
+    assert response.content == big_pdf
+    assert not main._PDF_CACHE
+
+
+def test_identical_submission_is_served_from_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    renders = []
+
+    async def fake_render(html: str) -> bytes:
+        renders.append(html)
+        return b"%PDF-cv"
+
+    monkeypatch.setattr(main, "_render_in_pool", fake_render)
+    main._PDF_CACHE.clear()
+    with TestClient(app) as client:
+        first = client.post("/generate", data=FORM)
+        second = client.post("/generate", data=FORM)
+        assert len(renders) == 1
+        assert first.content == second.content == b"%PDF-cv"
+
+        # Changement d'année : le pied de page change, le cache ne doit pas servir
+        next_year = main._year() + 1
+        monkeypatch.setattr(main, "_year", lambda: next_year)
+        client.post("/generate", data=FORM)
+    assert len(renders) == 2
@@ -4,8 +4,14 @@
 Analyse complète : syntaxe, format, style, logique, typage, sécurité
 """
 
+import hashlib
+import importlib.metadata
+import json
+import py_compile
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -16,7 +22,12 @@ from pathlib import Path
 LOG_DIR = Path("tools")
 LOG_PATH = LOG_DIR / ".last_analysis.log"
 APP_DIR = Path("app")
+CACHE_DIR = LOG_DIR / ".cache"
+CONFIG_FILES = [Path("pyproject.toml"), Path("setup.cfg"), Path("requirements.txt")]
+CACHE_MAX_AGE = 30 * 24 * 3600  # entrées inutilisées depuis 30 jours supprimées
 LOG_DIR.mkdir(exist_ok=True)
+# Liste des sources calculée une seule fois et partagée par tous les outils
+PY_FILES = [str(p) for p in sorted(APP_DIR.rglob("*.py"))]
 
 # ===========================
 # Fonctions utilitaires
@@ -39,6 +50,56 @@ def run_tool(name: str, cmd: list) -> tuple[bool, str]:
     except Exception as e:
         return False, f"Erreur : {e}"
 
+def compute_tree_key() -> str:
+    """Empreinte des sources, de la config et des paquets installés."""
+    digest = hashlib.blake2b(digest_size=16)
+    files = PY_FILES + [str(p) for p in CONFIG_FILES if p.exists()]
+    for path in files:
+        stat = Path(path).stat()
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode("utf-8"))
+    # mypy et pylint analysent aussi les dépendances (fastapi, pydantic...)
+    packages = sorted(
+        f"{dist.metadata['Name']}=={dist.version}"
+        for dist in importlib.metadata.distributions()
+    )
+    digest.update("\n".join(packages).encode("utf-8"))
+    return digest.hexdigest()
+
+def prune_cache() -> None:
+    """Supprime les résultats en cache qui n'ont pas servi depuis CACHE_MAX_AGE."""
+    limit = time.time() - CACHE_MAX_AGE
+    for entry in CACHE_DIR.glob("*.json"):
+        try:
+            if entry.stat().st_mtime < limit:
+                entry.unlink()
+        except OSError:
+            pass
+
+def run_tool_cached(name: str, cmd: list, tree_key: str) -> tuple[bool, str]:
+    """Réutilise le résultat si ni les sources ni l'outil n'ont changé."""
+    try:
+        version = importlib.metadata.version(cmd[2])  # [python, "-m", module, ...]
+    except importlib.metadata.PackageNotFoundError:
+        return run_tool(name, cmd)  # outil absent : ne pas figer ce résultat
+    raw_key = "\0".join([name, version, *cmd, tree_key]).encode("utf-8")
+    cache_key = hashlib.blake2b(raw_key, digest_size=16).hexdigest()
+    cache_path = CACHE_DIR / f"{cache_key}.json"
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        cache_path.touch()  # entrée encore utile : repousse son expiration
+        return cached["success"], cached["output"]
+    except (OSError, ValueError, KeyError):
+        pass
+    success, output = run_tool(name, cmd)
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        cache_path.write_text(
+            json.dumps({"success": success, "output": output}), encoding="utf-8"
+        )
+    except OSError as e:
+        print(f"Cache non écrit pour {name} : {e}")
+    return success, output
+
 def log_result(lines: list, tool: str, success: bool, details: str = "") -> None:
     status = "Réussi" if success else "Échec"
     lines.append(f"{tool} — {status}")
@@ -47,11 +108,20 @@ def log_result(lines: list, tool: str, success: bool, details: str = "") -> None
         lines.append(details)
     lines.append("")
 
+def check_syntax() -> tuple[bool, str]:
+    errors = []
+    for py_file in PY_FILES:
+        try:
+            py_compile.compile(py_file, doraise=True)
+        except py_compile.PyCompileError as e:
+            errors.append(str(e))
+    return (len(errors) == 0, "\n".join(errors))
+
 def check_requests_usage() -> tuple[bool, str]:
     issues = []
-    for py_file in APP_DIR.rglob("*.py"):
+    for py_file in PY_FILES:
         try:
-            content = py_file.read_text(encoding="utf-8")
+            content = Path(py_file).read_text(encoding="utf-8")
             if "requests." in content and "try:" not in content and "except" not in content:
                 issues.append(f"{py_file}: 'requests' utilisé sans try/except")
         except:
@@ -77,21 +147,30 @@ def main() -> int:
 
     # === OUTILS ===
     tools = {
-        "Syntaxe Python": [sys.executable, "-m", "py_compile"] + [str(p) for p in APP_DIR.rglob("*.py")],
-        "Black (formatage)": [sys.executable, "-m", "black", "--check", "--diff", str(APP_DIR)],
-        "Flake8 (lint)": [sys.executable, "-m", "flake8", str(APP_DIR)],
-        "Pylint (logique)": [sys.executable, "-m", "pylint", "--recursive=y", str(APP_DIR)],
-        "Mypy (typage)": [sys.executable, "-m", "mypy", str(APP_DIR)],
+        "Black (formatage)": [sys.executable, "-m", "black", "--check", "--diff", *PY_FILES],
+        "Flake8 (lint)": [sys.executable, "-m", "flake8", *PY_FILES],
+        "Pylint (logique)": [sys.executable, "-m", "pylint", *PY_FILES],
+        "Mypy (typage)": [sys.executable, "-m", "mypy", *PY_FILES],
     }
 
-    for name, cmd in tools.items():
-        print(f"{name}...")
-        success, output = run_tool(name, cmd)
-        log_result(report_lines, name, success, output)
-        print(f"{'Réussi' if success else 'Échec'}")
-        if not success:
-            all_success = False
-        print()
+    # Les outils tournent en parallèle, le rapport garde l'ordre ci-dessus
+    prune_cache()
+    tree_key = compute_tree_key()
+    with ThreadPoolExecutor(max_workers=len(tools) + 1) as executor:
+        # Vérification syntaxique dans ce processus, sans relancer d'interpréteur
+        futures = {"Syntaxe Python": executor.submit(check_syntax)}
+        futures.update(
+            (name, executor.submit(run_tool_cached, name, cmd, tree_key))
+            for name, cmd in tools.items()
+        )
+        for name, future in futures.items():
+            print(f"{name}...")
+            success, output = future.result()
+            log_result(report_lines, name, success, output)
+            print(f"{'Réussi' if success else 'Échec'}")
+            if not success:
+                all_success = False
+            print()
 
     # === VÉRIFICATION REQUESTS ===
     print("Requests (sécurité)...")
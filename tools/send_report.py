@@ -10,12 +10,16 @@ Compatible avec :
 """
 import os
 import io
+import hashlib
 import smtplib
 import subprocess
 import sys
 from email.mime.text import MIMEText
+from pathlib import Path
 from typing import Literal, Optional, List
 
+import requests
+
 # --- Forcer UTF-8 sur Windows ---
 if sys.platform == "win32":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
@@ -34,6 +38,27 @@ SENDER_EMAIL = os.getenv("SENDER_EMAIL")
 GEMINI_APP_PASSWORD = os.getenv("GEMINI_APP_PASSWORD")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# --- Taille maximale du diff envoyé à l'IA (en caractères) ---
+DIFF_MAX_CHARS = 3000
+# Un caractère UTF-8 tient sur 4 octets au plus
+DIFF_MAX_BYTES = 4 * DIFF_MAX_CHARS
+
+# --- Réponses de l'IA déjà obtenues, indexées par le contenu envoyé ---
+GEMINI_CACHE_DIR = Path("tools/.cache/gemini")
+# À incrémenter à chaque modification du prompt pour invalider le cache
+GEMINI_PROMPT_VERSION = "1"
+
+# --- Modèles Gemini essayés dans l'ordre ---
+GEMINI_MODELS = [
+    "gemini-2.5-flash",
+    "gemini-2.5-flash-lite",
+    "gemini-2.0-flash"
+]
+
+# --- Session HTTP partagée : connexion keep-alive réutilisée entre modèles ---
+GEMINI_SESSION = requests.Session()
+GEMINI_SESSION.headers.update({"Content-Type": "application/json"})
+
 # --- Vérification e-mail ---
 SEND_EMAIL_ENABLED = bool(SENDER_EMAIL and GEMINI_APP_PASSWORD)
 if not SEND_EMAIL_ENABLED:
@@ -68,19 +93,24 @@ def read_analysis_report() -> str:
         return f"Warning: Erreur lecture rapport : {e}"
 
 
+def read_git_output(args: List[str], limit: int) -> str:
+    """Lit au plus `limit` octets de la sortie d'une commande git."""
+    with subprocess.Popen(
+        ["git", *args], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    ) as proc:
+        assert proc.stdout is not None
+        data = proc.stdout.read(limit)
+        proc.kill()
+    return data.decode("utf-8", errors="replace")
+
+
 def get_git_diff() -> str:
     try:
-        result = subprocess.run(
-            ["git", "diff", "--cached"], capture_output=True, text=True,
-            check=False, encoding="utf-8"
-        )
-        if result.stdout.strip():
-            return result.stdout
-        result = subprocess.run(
-            ["git", "diff", "HEAD~1"], capture_output=True, text=True,
-            check=False, encoding="utf-8"
-        )
-        return result.stdout.strip() or "Aucun changement détecté."
+        diff = read_git_output(["diff", "--cached"], DIFF_MAX_BYTES)
+        if diff.strip():
+            return diff
+        diff = read_git_output(["diff", "HEAD~1"], DIFF_MAX_BYTES)
+        return diff.strip() or "Aucun changement détecté."
     except Exception as e:
         return f"Warning: Erreur git diff : {e}"
 
@@ -96,24 +126,48 @@ def get_changed_files() -> List[str]:
         return []
 
 
+def gemini_cache_key(report: str, diff: str, changed_files: List[str]) -> str:
+    """Empreinte du contenu envoyé à l'IA, sans l'en-tête horodaté du rapport."""
+    report_body = "\n".join(
+        line for line in report.splitlines()
+        if not line.startswith("Rapport d'analyse du ")
+    )
+    raw = "\0".join([
+        GEMINI_PROMPT_VERSION, *GEMINI_MODELS,
+        report_body, diff[:DIFF_MAX_CHARS], *sorted(changed_files),
+    ])
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def save_gemini_response(cache_path: Path, html: str) -> None:
+    """Écrit la réponse en cache de façon atomique (fichier temporaire + rename)."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(html, encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Warning: Cache IA non écrit : {e}")
+
+
 def ask_gemini_for_analysis(report: str, diff: str, changed_files: List[str]) -> str:
     if not GEMINI_API_KEY:
         return "<p style='color: orange;'>Warning: GEMINI_API_KEY manquante → IA désactivée.</p>"
 
-    MODELS = [
-        "gemini-2.5-flash",
-        "gemini-2.5-flash-lite",
-        "gemini-2.0-flash"
-    ]
+    cache_key = gemini_cache_key(report, diff, changed_files)
+    cache_path = GEMINI_CACHE_DIR / f"{cache_key}.html"
+    if cache_path.exists():
+        print("Réponse IA reprise du cache.")
+        cache_path.touch()  # entrée encore utile : repousse sa purge
+        return cache_path.read_text(encoding="utf-8")
 
-    for model in MODELS:
+    for model in GEMINI_MODELS:
         try:
-            import requests
             prompt = f"""
 Tu es un expert en revue de code Python. Génère un **rapport HTML complet** :
 **Fichiers modifiés** : {', '.join(changed_files) or 'Aucun'}
 **Diff Git** :
-{diff[:3000]}
+{diff[:DIFF_MAX_CHARS]}
 **Rapport d’analyse** :
 {report}
 **Style** :
@@ -125,11 +179,10 @@ Tu es un expert en revue de code Python. Génère un **rapport HTML complet** :
 - Ton professionnel, clair, actionnable
 """
             url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
-            headers = {"Content-Type": "application/json"}
             params = {"key": GEMINI_API_KEY}
             payload = {"contents": [{"parts": [{"text": prompt}]}]}
 
-            response = requests.post(url, headers=headers, params=params, json=payload, timeout=60)
+            response = GEMINI_SESSION.post(url, params=params, json=payload, timeout=60)
             response.raise_for_status()
             data = response.json()
             text = (
@@ -138,8 +191,11 @@ Tu es un expert en revue de code Python. Génère un **rapport HTML complet** :
                 .get("parts", [{}])[0]
                 .get("text", "")
             )
-            html = text.replace("```html", "").replace("```", "").strip()
-            return html or "<p>Warning: Réponse vide de l’IA.</p>"
+            html: str = text.replace("```html", "").replace("```", "").strip()
+            if not html:
+                return "<p>Warning: Réponse vide de l’IA.</p>"
+            save_gemini_response(cache_path, html)
+            return html
 
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404: